@@ -0,0 +1,182 @@
+import numpy as np
+import time
+from collections import deque
+from process_data import HISTORY_LENGTH, match_snapshots, process_keys
+
+# Streaming anomaly detection over the system series and every live process.
+# Each series keeps a fixed-size row of EWMA state that is updated in O(1)
+# per sample; all series of a kind are updated together as numpy arrays.
+
+RSS_LEAK = "RSS leak"
+CPU_SHIFT = "CPU regime change"
+PROCESS_SURGE = "Process surge"
+MEMORY_GROWTH = "Memory growth"
+
+# Columns of the per-series state rows, stored as float32 (36 bytes a series)
+FAST, SLOW, VAR, PEAK, BASE, GROWTH, STALL, PENDING, COUNT = range(9)
+STATE_FIELDS = 9
+
+def smoothing(elapsed, tau):
+    # Per-sample EWMA weight for a time constant in seconds, so the smoothing
+    # behaves the same whatever the refresh interval is
+    if tau <= 0:
+        return 1.0
+    return 1.0 - np.exp(-elapsed / tau)
+
+class SeriesDetector:
+    def __init__(self, threshold=3.0, floor=0.0, upward_only=True, detect_shift=True,
+                 fast_tau=9.0, slow_tau=40.0, var_tau=300.0, outlier_weight=0.5, warmup=20,
+                 min_growth=None, growth_seconds=120.0, stall_seconds=180.0):
+        # A shift is flagged when the fast EWMA moves more than `threshold`
+        # standard deviations (plus `floor`) away from the slow EWMA. Time
+        # constants are in seconds; `warmup` is a number of samples.
+        # Growth is tracked by ratcheting the fast EWMA past its running peak
+        # by a noise-scaled deadband. It is flagged once the rise has lasted
+        # `growth_seconds` and gained at least `min_growth`, and the episode
+        # ends after `stall_seconds` without a new peak.
+        self.threshold = threshold
+        self.floor = floor
+        self.upward_only = upward_only
+        self.detect_shift = detect_shift
+        self.fast_tau = fast_tau
+        self.slow_tau = slow_tau
+        self.var_tau = var_tau
+        self.outlier_weight = outlier_weight
+        self.warmup = warmup
+        self.min_growth = min_growth
+        self.growth_seconds = growth_seconds
+        self.stall_seconds = stall_seconds
+
+        self.keys = np.empty(0, dtype=np.int64)
+        self.create_times = np.empty(0)
+        self.state = np.zeros((0, STATE_FIELDS), dtype=np.float32)
+        self.timestamp = None
+
+    def update(self, keys, create_times, values, timestamp):
+        values = np.nan_to_num(np.asarray(values, dtype=np.float32))
+        state = np.zeros((len(values), STATE_FIELDS), dtype=np.float32)
+        for field in (FAST, SLOW, PEAK, BASE):
+            state[:, field] = values
+
+        matched, idx = match_snapshots(self.keys, self.create_times, keys, create_times)
+        state[matched] = self.state[idx[matched]]
+        elapsed = 0.0 if self.timestamp is None else max(timestamp - self.timestamp, 1e-6)
+        fast_alpha = smoothing(elapsed, self.fast_tau)
+        slow_alpha = smoothing(elapsed, self.slow_tau)
+        # Plain running variance until the long time constant takes over
+        var_alpha = np.maximum(smoothing(elapsed, self.var_tau), 1 / (state[:, COUNT] + 1))
+
+        fast, slow, var = state[:, FAST], state[:, SLOW], state[:, VAR]
+        std = np.sqrt(var)
+        band = self.threshold * std + self.floor
+        warm = state[:, COUNT] >= self.warmup
+        shifted = np.zeros(len(values), dtype=bool)
+        if self.detect_shift:
+            shift = fast + fast_alpha * (values - fast) - slow
+            if not self.upward_only:
+                shift = np.abs(shift)
+            shifted = warm & (shift > band)
+
+        # Once warmed up, samples outside the band are held back while the
+        # excursion lasts, so a new regime can't widen the band enough to hide
+        # itself. When the series returns inside the band the excursion was a
+        # peak, and it is added to the variance at a reduced weight so that
+        # recurring peaks widen the band over time.
+        delta = values - slow
+        outlier = warm & (np.abs(delta) > band)
+        squared = delta * delta
+        returned = ~outlier & (state[:, PENDING] > 0)
+        var = var + np.where(returned, var_alpha * self.outlier_weight * state[:, PENDING], 0)
+        state[:, PENDING] = np.where(outlier, state[:, PENDING] + squared, 0)
+        state[:, VAR] = np.where(outlier, var, (1 - var_alpha) * (var + var_alpha * squared))
+        state[:, FAST] += fast_alpha * (values - fast)
+        state[:, SLOW] += slow_alpha * delta
+        state[:, COUNT] += 1
+
+        grown = np.zeros(len(values), dtype=bool)
+        if self.min_growth is not None:
+            grown = self.update_growth(state, std, elapsed, fast_alpha)
+
+        self.keys = keys
+        self.create_times = create_times
+        self.state = state
+        self.timestamp = timestamp
+        return shifted, grown
+
+    def update_growth(self, state, std, elapsed, fast_alpha):
+        level = state[:, FAST]
+        # Deadband: the fast EWMA's own noise plus a small fraction of min_growth
+        deadband = self.threshold * std * np.sqrt(fast_alpha / (2 - fast_alpha)) + \
+                   self.min_growth / 20
+        rising = level > state[:, PEAK] + deadband
+        started = rising & (state[:, PEAK] <= state[:, BASE])
+        state[:, GROWTH] = np.where(started, 0, state[:, GROWTH] + elapsed)
+        state[:, STALL] = np.where(rising, 0, state[:, STALL] + elapsed)
+        state[:, PEAK] = np.where(rising, level, state[:, PEAK])
+
+        # Flat for stall_seconds: the episode is over, re-anchor at the current level
+        flat = state[:, STALL] >= self.stall_seconds
+        state[flat, PEAK] = level[flat]
+        state[flat, BASE] = level[flat]
+        state[flat, GROWTH] = 0
+        state[flat, STALL] = 0
+
+        return (state[:, GROWTH] - state[:, STALL] >= self.growth_seconds) & \
+               (state[:, PEAK] - state[:, BASE] >= self.min_growth)
+
+class AnomalyMonitor:
+    def __init__(self, maxlen=HISTORY_LENGTH):
+        self.process_cpu = SeriesDetector(floor=15.0)
+        self.process_rss = SeriesDetector(detect_shift=False, min_growth=20.0)
+        self.system_cpu = SeriesDetector(floor=10.0, upward_only=False)
+        self.system_mem = SeriesDetector(detect_shift=False, min_growth=2.0)
+        self.process_count = SeriesDetector(threshold=4.0, floor=10.0, fast_tau=0.0)
+
+        self.flagged = {}
+        self.system_flags = []
+        # Parallel to the SystemHistory deques so the graph can mark samples
+        self.cpu_flags = deque(maxlen=maxlen)
+        self.mem_flags = deque(maxlen=maxlen)
+        self.surge_flags = deque(maxlen=maxlen)
+
+    def update(self, processes, cpu_overall, mem_percent, timestamp=None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        pids, create_times = process_keys(processes)
+        cpu = np.fromiter((proc['cpu'] or 0.0 for proc in processes.values()),
+                          dtype=np.float32, count=len(processes))
+        rss = np.fromiter((proc['memory'] for proc in processes.values()),
+                          dtype=np.float32, count=len(processes))
+
+        cpu_shift, _ = self.process_cpu.update(pids, create_times, cpu, timestamp)
+        _, rss_leak = self.process_rss.update(pids, create_times, rss, timestamp)
+
+        self.flagged = {}
+        for i in np.flatnonzero(cpu_shift | rss_leak):
+            reasons = []
+            if rss_leak[i]:
+                reasons.append(RSS_LEAK)
+            if cpu_shift[i]:
+                reasons.append(CPU_SHIFT)
+            self.flagged[int(pids[i])] = reasons
+        for pid, proc in processes.items():
+            proc['anomaly'] = self.flagged.get(pid, [])
+
+        system = np.zeros(1, dtype=np.int64)
+        system_time = np.zeros(1)
+        cpu_flag, _ = self.system_cpu.update(system, system_time, [cpu_overall], timestamp)
+        _, mem_flag = self.system_mem.update(system, system_time, [mem_percent], timestamp)
+        surge, _ = self.process_count.update(system, system_time, [len(processes)], timestamp)
+
+        self.system_flags = [reason for reason, flag in ((CPU_SHIFT, cpu_flag[0]),
+                                                         (MEMORY_GROWTH, mem_flag[0]),
+                                                         (PROCESS_SURGE, surge[0])) if flag]
+        self.cpu_flags.append(bool(cpu_flag[0]))
+        self.mem_flags.append(bool(mem_flag[0]))
+        self.surge_flags.append(bool(surge[0]))
+        return self.flagged
+
+    def summary(self):
+        parts = list(self.system_flags)
+        if self.flagged:
+            parts.append(f"{len(self.flagged)} flagged processes")
+        return ", ".join(parts)
@@ -0,0 +1,212 @@
+import numpy as np
+import psutil
+import time
+from collections import deque
+
+# Shared data model used by both the Tk dashboard and the terminal frontend.
+# Nothing in here may import a GUI toolkit.
+
+HISTORY_LENGTH = 50
+REFRESH_OPTIONS = [0.5, 1.0, 2.0, 3.0, 5.0]
+SYSTEM_USERS = ['SYSTEM', 'root', 'NT AUTHORITY\\SYSTEM']
+
+CPU_FILTER_OPTIONS = ["All", "10", "25", "50", "75"]
+MEM_FILTER_OPTIONS = ["All", "50", "100", "250", "500"]
+TYPE_FILTER_OPTIONS = ["All", "System", "User"]
+
+# Rows above these are highlighted in both frontends
+HIGH_CPU_PERCENT = 50
+HIGH_MEMORY_MB = 100
+
+COLUMNS = ("PID", "Name", "State", "CPU %", "Memory (MB)")
+BASE_ATTRS = ['pid', 'name', 'status', 'cpu_percent', 'memory_info', 'username', 'create_time']
+FD_ATTR = 'num_handles' if psutil.WINDOWS else 'num_fds'
+
+# Optional columns: process key, psutil attribute, counter field and scale.
+# Columns with a counter field are shown as a rate derived from the delta
+# between two snapshots; the others are shown as sampled. Columns whose
+# attribute this platform's psutil lacks (io_counters on macOS) are dropped,
+# as process_iter rejects unknown attribute names.
+OPTIONAL_COLUMNS = {col: spec for col, spec in {
+    "Read (KB/s)": ('read_rate', 'io_counters', 'read_bytes', 1 / 1024),
+    "Write (KB/s)": ('write_rate', 'io_counters', 'write_bytes', 1 / 1024),
+    "Vol CS/s": ('vol_ctx_rate', 'num_ctx_switches', 'voluntary', 1),
+    "Invol CS/s": ('invol_ctx_rate', 'num_ctx_switches', 'involuntary', 1),
+    "Threads": ('threads', 'num_threads', None, 1),
+    "FDs": ('fds', FD_ATTR, None, 1)
+}.items() if hasattr(psutil.Process, spec[1])}
+COLUMN_GROUPS = {group: cols for group, cols in {
+    "Disk I/O": ("Read (KB/s)", "Write (KB/s)"),
+    "Context Switches": ("Vol CS/s", "Invol CS/s"),
+    "Threads": ("Threads",),
+    "Open FDs": ("FDs",)
+}.items() if all(col in OPTIONAL_COLUMNS for col in cols)}
+
+NUMERIC_COLUMNS = ("PID", "CPU %", "Memory (MB)") + tuple(OPTIONAL_COLUMNS)
+COLUMN_KEYS = {
+    "PID": 'pid',
+    "Name": 'name',
+    "State": 'state',
+    "CPU %": 'cpu',
+    "Memory (MB)": 'memory'
+}
+COLUMN_KEYS.update({col: spec[0] for col, spec in OPTIONAL_COLUMNS.items()})
+
+def match_snapshots(prev_pids, prev_create_times, pids, create_times):
+    # Rows are matched to the previous snapshot by PID and create time, so a
+    # recycled PID is treated as a new process. Returns the matched mask and,
+    # for matched rows, their index in the previous snapshot.
+    if not len(prev_pids) or not len(pids):
+        return np.zeros(len(pids), dtype=bool), np.zeros(len(pids), dtype=np.intp)
+    order = np.argsort(prev_pids)
+    pos = np.minimum(np.searchsorted(prev_pids[order], pids), len(prev_pids) - 1)
+    idx = order[pos]
+    matched = (prev_pids[idx] == pids) & (prev_create_times[idx] == create_times)
+    return matched, idx
+
+class CounterRates:
+    def __init__(self):
+        self.fields = ()
+        self.pids = np.empty(0, dtype=np.int64)
+        self.create_times = np.empty(0)
+        self.counters = np.empty((0, 0))
+        self.timestamp = None
+
+    def update(self, fields, pids, create_times, counters, timestamp):
+        # Rows without a previous sample are NaN
+        rates = np.full(counters.shape, np.nan)
+        if self.timestamp is not None and fields == self.fields:
+            matched, idx = match_snapshots(self.pids, self.create_times, pids, create_times)
+            elapsed = max(timestamp - self.timestamp, 1e-6)
+            delta = (counters[matched] - self.counters[idx[matched]]) / elapsed
+            delta[delta < 0] = np.nan
+            rates[matched] = delta
+
+        self.fields = fields
+        self.pids = pids
+        self.create_times = create_times
+        self.counters = counters
+        self.timestamp = timestamp
+        return rates
+
+class ProcessCollector:
+    def __init__(self, columns=()):
+        self.columns = tuple(columns)
+        self.rates = CounterRates()
+
+    def collect(self):
+        # Read once: the Tk frontend may swap self.columns from another thread
+        columns = [col for col in OPTIONAL_COLUMNS if col in self.columns]
+        attrs = BASE_ATTRS + sorted({OPTIONAL_COLUMNS[col][1] for col in columns})
+        rate_columns = [col for col in columns if OPTIONAL_COLUMNS[col][2]]
+        gauge_columns = [col for col in columns if not OPTIONAL_COLUMNS[col][2]]
+
+        processes = {}
+        counters = []
+        try:
+            for proc in psutil.process_iter(attrs):
+                info = proc.info
+                username = info['username'] or "Unknown"
+                entry = {
+                    'pid': info['pid'],
+                    'name': info['name'],
+                    'state': info['status'],
+                    'cpu': info['cpu_percent'],
+                    'memory': info['memory_info'].rss / 1024 / 1024,
+                    'username': username,
+                    'create_time': time.ctime(info['create_time']),
+                    'create_timestamp': info['create_time'],
+                    'is_system': username in SYSTEM_USERS
+                }
+                for col in gauge_columns:
+                    key, attr, _, _ = OPTIONAL_COLUMNS[col]
+                    entry[key] = info[attr]
+                if rate_columns:
+                    row = []
+                    for col in rate_columns:
+                        _, attr, field, _ = OPTIONAL_COLUMNS[col]
+                        row.append(getattr(info[attr], field) if info[attr] is not None else None)
+                    counters.append(row)
+                processes[info['pid']] = entry
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+
+        if rate_columns:
+            self.apply_rates(processes, rate_columns, counters)
+        else:
+            # Drop the old snapshot so re-enabled columns don't report a rate
+            # averaged over the whole time they were switched off
+            self.rates = CounterRates()
+        return processes
+
+    def apply_rates(self, processes, rate_columns, counters):
+        pids, create_times = process_keys(processes)
+        data = np.array(counters, dtype=float).reshape(len(pids), len(rate_columns))
+        scales = np.array([OPTIONAL_COLUMNS[col][3] for col in rate_columns])
+        rates = self.rates.update(tuple(rate_columns), pids, create_times, data,
+                                  time.monotonic()) * scales
+
+        rates = np.where(np.isnan(rates), None, rates).tolist()
+        keys = [OPTIONAL_COLUMNS[col][0] for col in rate_columns]
+        for entry, row in zip(processes.values(), rates):
+            entry.update(zip(keys, row))
+
+def process_keys(processes):
+    pids = np.fromiter(processes, dtype=np.int64, count=len(processes))
+    create_times = np.fromiter((proc['create_timestamp'] for proc in processes.values()),
+                               dtype=float, count=len(processes))
+    return pids, create_times
+
+def get_process_data():
+    return ProcessCollector().collect()
+
+def format_column(proc, col):
+    if col in OPTIONAL_COLUMNS:
+        value = proc.get(OPTIONAL_COLUMNS[col][0])
+        if value is None:
+            return "-"
+        return f"{value:.1f}" if OPTIONAL_COLUMNS[col][2] else str(value)
+    if col == "CPU %":
+        return f"{proc['cpu']:.1f}"
+    if col == "Memory (MB)":
+        return f"{proc['memory']:.1f}"
+    value = proc[COLUMN_KEYS[col]]
+    return "" if value is None else str(value)
+
+def passes_filters(proc, cpu_threshold="All", mem_threshold="All", user_type="All"):
+    cpu_ok = (cpu_threshold == "All") or (proc.get('cpu', 0.0) >= float(cpu_threshold))
+    mem_ok = (mem_threshold == "All") or (proc.get('memory', 0.0) >= float(mem_threshold))
+    user_ok = (user_type == "All") or \
+             (user_type == "System" and proc.get('is_system', False)) or \
+             (user_type == "User" and not proc.get('is_system', True))
+    return cpu_ok and mem_ok and user_ok
+
+def sort_processes(processes, col, reverse=False):
+    key = COLUMN_KEYS[col]
+    if col in NUMERIC_COLUMNS:
+        return sorted(processes, key=lambda p: p.get(key) or 0.0, reverse=reverse)
+    return sorted(processes, key=lambda p: str(p.get(key) or "").lower(), reverse=reverse)
+
+def usage_level(value):
+    if value <= 45:
+        return 'low'
+    if value <= 75:
+        return 'medium'
+    return 'high'
+
+class SystemHistory:
+    def __init__(self, maxlen=HISTORY_LENGTH):
+        self.cpu_overall = deque(maxlen=maxlen)
+        self.cpu_per_core = [deque(maxlen=maxlen) for _ in range(psutil.cpu_count())]
+        self.memory = deque(maxlen=maxlen)
+
+    def sample(self):
+        cpu_overall = psutil.cpu_percent()
+        cpu_per_core = psutil.cpu_percent(percpu=True)
+        self.cpu_overall.append(cpu_overall)
+        for i, cpu in enumerate(cpu_per_core):
+            self.cpu_per_core[i].append(cpu)
+
+        mem_percent = psutil.virtual_memory().percent
+        self.memory.append(mem_percent)
+        return cpu_overall, mem_percent
@@ -5,9 +5,14 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
 import time
-from collections import deque
 import subprocess
 from datetime import datetime
+from process_data import (
+    SystemHistory, ProcessCollector, passes_filters, sort_processes, usage_level, format_column,
+    COLUMNS, OPTIONAL_COLUMNS, COLUMN_GROUPS, HIGH_CPU_PERCENT, HIGH_MEMORY_MB,
+    CPU_FILTER_OPTIONS, MEM_FILTER_OPTIONS, TYPE_FILTER_OPTIONS
+)
+from anomaly_detection import AnomalyMonitor, CPU_SHIFT, RSS_LEAK, MEMORY_GROWTH, PROCESS_SURGE
 
 # Modern Theme Configurations
 themes = {
@@ -30,6 +35,7 @@ themes = {
         "ax_bg": "#2d2d2d",
         "status_bg": "#2d2d2d",
         "system_bg": "#34495e",
+        "anomaly_bg": "#8e44ad",
         "section_bg": "#2d2d2d",
         "border": "#3d3d3d",
         "text_secondary": "#b3b3b3",
@@ -54,6 +60,7 @@ themes = {
         "ax_bg": "#f8f9fa",
         "status_bg": "#f1f2f6",
         "system_bg": "#74b9ff",
+        "anomaly_bg": "#d7bde2",
         "section_bg": "#f1f2f6",
         "border": "#dfe6e9",
         "text_secondary": "#636e72",
@@ -141,10 +148,13 @@ class ProcessMonitor:
         # Initialize variables
         self.current_theme = "light"
         self.existing_processes = {}
-        self.cpu_history_overall = deque(maxlen=50)
-        self.cpu_history_per_core = [deque(maxlen=50) for _ in range(psutil.cpu_count())]
-        self.mem_history = deque(maxlen=50)
-        self.sort_reverse = {"PID": False, "Name": False, "State": False, "CPU %": False, "Memory (MB)": False}
+        self.history = SystemHistory()
+        self.cpu_history_overall = self.history.cpu_overall
+        self.cpu_history_per_core = self.history.cpu_per_core
+        self.mem_history = self.history.memory
+        self.anomalies = AnomalyMonitor()
+        self.sort_reverse = {col: False for col in COLUMNS + tuple(OPTIONAL_COLUMNS)}
+        self.collector = ProcessCollector()
         
         # Variables for filters and controls
         self.cpu_filter_var = tk.StringVar(value="All")
@@ -154,6 +164,7 @@ class ProcessMonitor:
         self.core_var = tk.StringVar(value="All")
         self.refresh_var = tk.DoubleVar(value=2.0)
         self.status_var = tk.StringVar()
+        self.column_vars = {group: tk.BooleanVar(value=False) for group in COLUMN_GROUPS}
         
         self.setup_ui()
         self.start_monitor_thread()
@@ -226,6 +237,13 @@ class ProcessMonitor:
         refresh_options = ["1.0", "2.0", "3.0", "5.0"]
         ttk.OptionMenu(controls_frame, self.refresh_var, "2.0", *refresh_options,
                       command=lambda val: self.refresh_var.set(float(val))).pack(side='left', padx=5)
+        
+        columns_btn = ttk.Menubutton(controls_frame, text="Columns")
+        columns_menu = tk.Menu(columns_btn, tearoff=False)
+        for group, var in self.column_vars.items():
+            columns_menu.add_checkbutton(label=group, variable=var, command=self.update_columns)
+        columns_btn["menu"] = columns_menu
+        columns_btn.pack(side='left', padx=5)
     
     def setup_system_info(self):
         info_frame = ttk.Frame(self.main_frame)
@@ -259,15 +277,15 @@ class ProcessMonitor:
         left_frame.pack(side='left', padx=10)
         
         ttk.Label(left_frame, text="CPU ≥").pack(side="left", padx=(0, 5))
-        ttk.OptionMenu(left_frame, self.cpu_filter_var, "All", "All", "10", "25", "50", "75",
+        ttk.OptionMenu(left_frame, self.cpu_filter_var, "All", *CPU_FILTER_OPTIONS,
                       command=lambda _: self.apply_filters()).pack(side="left")
         
         ttk.Label(left_frame, text="MB ≥").pack(side="left", padx=(10, 5))
-        ttk.OptionMenu(left_frame, self.mem_filter_var, "All", "All", "50", "100", "250", "500",
+        ttk.OptionMenu(left_frame, self.mem_filter_var, "All", *MEM_FILTER_OPTIONS,
                       command=lambda _: self.apply_filters()).pack(side="left")
         
         ttk.Label(left_frame, text="Type:").pack(side="left", padx=(10, 5))
-        ttk.OptionMenu(left_frame, self.user_filter_var, "All", "All", "System", "User",
+        ttk.OptionMenu(left_frame, self.user_filter_var, "All", *TYPE_FILTER_OPTIONS,
                       command=lambda _: self.apply_filters()).pack(side="left")
         
         tk.Button(left_frame, text="Clear Filters",
@@ -341,7 +359,8 @@ class ProcessMonitor:
         scrollbar.pack(side='right', fill='y')
         
         self.tree = ttk.Treeview(table_frame,
-                                columns=("PID", "Name", "State", "CPU %", "Memory (MB)"),
+                                columns=COLUMNS + tuple(OPTIONAL_COLUMNS),
+                                displaycolumns=COLUMNS,
                                 show="headings",
                                 yscrollcommand=scrollbar.set)
         
@@ -352,12 +371,16 @@ class ProcessMonitor:
         self.tree.column("State", width=150, anchor="center")
         self.tree.column("CPU %", width=120, anchor="center")
         self.tree.column("Memory (MB)", width=150, anchor="center")
+        for col in OPTIONAL_COLUMNS:
+            self.tree.column(col, width=110, anchor="center")
         
-        for col in ("PID", "Name", "State", "CPU %", "Memory (MB)"):
+        for col in COLUMNS + tuple(OPTIONAL_COLUMNS):
             self.tree.heading(col, text=col, command=lambda c=col: self.sort_treeview(c, self.sort_reverse[c]))
         
         self.tree.pack(fill='both', expand=True)
         
+        # Tags created first take priority, so anomaly must come before the others
+        self.tree.tag_configure("anomaly", background=themes[self.current_theme]["anomaly_bg"])
         self.tree.tag_configure("high_cpu", background="#ff6666" if self.current_theme == "dark" else "#ff9999")
         self.tree.tag_configure("high_mem", background="#ffcc66" if self.current_theme == "dark" else "#ffe066")
         self.tree.tag_configure("system_process", background=themes[self.current_theme]["system_bg"])
@@ -400,6 +423,7 @@ class ProcessMonitor:
         
         update_button_colors(self.main_frame)
         
+        self.tree.tag_configure("anomaly", background=themes[self.current_theme]["anomaly_bg"])
         self.tree.tag_configure("high_cpu", background="#ff6666" if self.current_theme == "dark" else "#ff9999")
         self.tree.tag_configure("high_mem", background="#ffcc66" if self.current_theme == "dark" else "#ffe066")
         self.tree.tag_configure("system_process", background=themes[self.current_theme]["system_bg"])
@@ -412,25 +436,17 @@ class ProcessMonitor:
         self.update_graph()
     
     def get_process_data(self):
-        processes = {}
-        try:
-            for proc in psutil.process_iter(['pid', 'name', 'status', 'cpu_percent', 
-                                           'memory_info', 'username', 'create_time']):
-                info = proc.info
-                username = info['username'] or "Unknown"
-                processes[info['pid']] = {
-                    'pid': info['pid'],
-                    'name': info['name'],
-                    'state': info['status'],
-                    'cpu': info['cpu_percent'],
-                    'memory': info['memory_info'].rss / 1024 / 1024,
-                    'username': username,
-                    'create_time': time.ctime(info['create_time']),
-                    'is_system': username in ['SYSTEM', 'root', 'NT AUTHORITY\\SYSTEM']
-                }
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-        return processes
+        return self.collector.collect()
+    
+    def enabled_columns(self):
+        return tuple(col for col in OPTIONAL_COLUMNS
+                     if any(self.column_vars[group].get() and col in cols
+                            for group, cols in COLUMN_GROUPS.items()))
+    
+    def update_columns(self):
+        enabled = self.enabled_columns()
+        self.collector.columns = enabled
+        self.tree["displaycolumns"] = COLUMNS + enabled
     
     def kill_process(self):
         selected = self.tree.selection()
@@ -473,13 +489,16 @@ class ProcessMonitor:
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
         if filename:
             try:
+                extra = self.enabled_columns()
                 with open(filename, 'w') as f:
-                    f.write("PID,Name,State,CPU %,Memory (MB),Username,Type,Created\n")
+                    f.write("PID,Name,State,CPU %,Memory (MB),Username,Type,Created"
+                           + "".join(f",{col}" for col in extra) + "\n")
                     for proc in self.existing_processes.values():
                         proc_type = "System" if proc['is_system'] else "User"
                         f.write(f"{proc['pid']},{proc['name']},{proc['state']},"
                                f"{proc['cpu']:.1f},{proc['memory']:.1f},"
-                               f"{proc['username']},{proc_type},{proc['create_time']}\n")
+                               f"{proc['username']},{proc_type},{proc['create_time']}"
+                               + "".join(f",{format_column(proc, col)}" for col in extra) + "\n")
                 messagebox.showinfo("Success", f"Data exported to {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export: {e}")
@@ -491,18 +510,14 @@ class ProcessMonitor:
         
         for item in self.tree.get_children():
             values = self.tree.item(item)["values"]
-            proc = self.existing_processes.get(int(values[0]), {})
+            proc = dict(self.existing_processes.get(int(values[0]), {}),
+                        cpu=float(values[3]), memory=float(values[4]))
             
-            cpu_ok = (cpu_threshold == "All") or (float(values[3]) >= float(cpu_threshold))
-            mem_ok = (mem_threshold == "All") or (float(values[4]) >= float(mem_threshold))
-            user_ok = (user_type == "All") or \
-                     (user_type == "System" and proc.get('is_system', False)) or \
-                     (user_type == "User" and not proc.get('is_system', True))
-            
-            if cpu_ok and mem_ok and user_ok:
-                self.tree.item(item, tags=())
+            tags = tuple(tag for tag in self.tree.item(item, "tags") if tag != 'hidden')
+            if passes_filters(proc, cpu_threshold, mem_threshold, user_type):
+                self.tree.item(item, tags=tags)
             else:
-                self.tree.item(item, tags=('hidden',))
+                self.tree.item(item, tags=tags + ('hidden',))
     
     def clear_filters(self):
         self.cpu_filter_var.set("All")
@@ -526,19 +541,23 @@ class ProcessMonitor:
                     f"Type: {'System' if proc['is_system'] else 'User'}\n"
                     f"Created: {proc['create_time']}"
                 )
+                if proc.get('anomaly'):
+                    details += f"\nAnomaly: {', '.join(proc['anomaly'])}"
+                for col, (key, _, _, _) in OPTIONAL_COLUMNS.items():
+                    if key in proc:
+                        details += f"\n{col}: {format_column(proc, col)}"
                 messagebox.showinfo("Process Details", details)
     
     def sort_treeview(self, col, reverse):
-        data = [(self.tree.set(item, col), item) for item in self.tree.get_children()]
+        items = {int(self.tree.item(item)["values"][0]): item for item in self.tree.get_children()}
         
         self.sort_reverse[col] = not self.sort_reverse[col]
         
-        if col in ["CPU %", "Memory (MB)"]:
-            data.sort(key=lambda x: float(x[0]), reverse=self.sort_reverse[col])
-        else:
-            data.sort(key=lambda x: x[0].lower(), reverse=self.sort_reverse[col])
+        known = [self.existing_processes[pid] for pid in items if pid in self.existing_processes]
+        ordered = [items[proc['pid']] for proc in sort_processes(known, col, self.sort_reverse[col])]
+        ordered += [item for pid, item in items.items() if pid not in self.existing_processes]
         
-        for index, (val, item) in enumerate(data):
+        for index, item in enumerate(ordered):
             self.tree.move(item, '', index)
         
         for column in self.tree["columns"]:
@@ -553,15 +572,18 @@ class ProcessMonitor:
         
         for pid, proc in processes.items():
             tags = []
-            if proc['cpu'] > 50:
+            if proc['cpu'] > HIGH_CPU_PERCENT:
                 tags.append("high_cpu")
-            if proc['memory'] > 100:
+            if proc['memory'] > HIGH_MEMORY_MB:
                 tags.append("high_mem")
             if proc['is_system']:
                 tags.append("system_process")
+            if proc.get('anomaly'):
+                tags.append("anomaly")
                 
             values = (proc['pid'], proc['name'], proc['state'], 
-                     f"{proc['cpu']:.1f}", f"{proc['memory']:.1f}")
+                     f"{proc['cpu']:.1f}", f"{proc['memory']:.1f}") + \
+                     tuple(format_column(proc, col) for col in OPTIONAL_COLUMNS)
                     
             if pid in current_items:
                 self.tree.item(current_items[pid], values=values, tags=tags)
@@ -604,26 +626,21 @@ class ProcessMonitor:
         if self.graph_mode_var.get() == "overall":
             cpu_data = list(self.cpu_history_overall)
             if cpu_data:
-                line_color = colors['low'] if cpu_data[-1] <= 45 else \
-                            colors['medium'] if cpu_data[-1] <= 75 else \
-                            colors['high']
-                fill_color = fill_colors['low'] if cpu_data[-1] <= 45 else \
-                            fill_colors['medium'] if cpu_data[-1] <= 75 else \
-                            fill_colors['high']
+                line_color = colors[usage_level(cpu_data[-1])]
+                fill_color = fill_colors[usage_level(cpu_data[-1])]
                 self.ax_cpu.plot(cpu_data, label=f"Overall CPU Usage\n{cpu_count} Cores @ {cpu_freq.current:.1f}MHz",
                                color=line_color, linewidth=2)
                 self.ax_cpu.fill_between(range(len(cpu_data)), cpu_data, alpha=0.3, color=fill_color)
+                self.plot_anomalies(self.ax_cpu, cpu_data, list(self.anomalies.cpu_flags), CPU_SHIFT)
+                self.plot_anomalies(self.ax_cpu, cpu_data, list(self.anomalies.surge_flags),
+                                    PROCESS_SURGE, marker='^')
         elif self.graph_mode_var.get() == "per-core":
             if self.core_var.get() == "All":
                 for i, history in enumerate(self.cpu_history_per_core):
                     core_data = list(history)
                     if core_data:
-                        line_color = colors['low'] if core_data[-1] <= 45 else \
-                                    colors['medium'] if core_data[-1] <= 75 else \
-                                    colors['high']
-                        fill_color = fill_colors['low'] if core_data[-1] <= 45 else \
-                                    fill_colors['medium'] if core_data[-1] <= 75 else \
-                                    fill_colors['high']
+                        line_color = colors[usage_level(core_data[-1])]
+                        fill_color = fill_colors[usage_level(core_data[-1])]
                         self.ax_cpu.plot(core_data, label=f"Core {i}", 
                                        color=line_color, linewidth=1.5)
                         self.ax_cpu.fill_between(range(len(core_data)), core_data, alpha=0.2, color=fill_color)
@@ -631,27 +648,23 @@ class ProcessMonitor:
                 core_idx = int(self.core_var.get().split()[1])
                 core_data = list(self.cpu_history_per_core[core_idx])
                 if core_data:
-                    line_color = colors['low'] if core_data[-1] <= 45 else \
-                                colors['medium'] if core_data[-1] <= 75 else \
-                                colors['high']
-                    fill_color = fill_colors['low'] if core_data[-1] <= 45 else \
-                                fill_colors['medium'] if core_data[-1] <= 75 else \
-                                fill_colors['high']
+                    line_color = colors[usage_level(core_data[-1])]
+                    fill_color = fill_colors[usage_level(core_data[-1])]
                     self.ax_cpu.plot(core_data, label=f"Core {core_idx}",
                                    color=line_color, linewidth=2)
                     self.ax_cpu.fill_between(range(len(core_data)), core_data, alpha=0.3, color=fill_color)
         
         mem_data = list(self.mem_history)
         if mem_data:
-            mem_color = colors['low'] if mem_data[-1] <= 45 else \
-                       colors['medium'] if mem_data[-1] <= 75 else \
-                       colors['high']
-            mem_fill_color = fill_colors['low'] if mem_data[-1] <= 45 else \
-                           fill_colors['medium'] if mem_data[-1] <= 75 else \
-                           fill_colors['high']
+            mem_color = colors[usage_level(mem_data[-1])]
+            mem_fill_color = fill_colors[usage_level(mem_data[-1])]
             self.ax_mem.plot(mem_data, label=f"Memory Usage\n{memory.used/1024/1024/1024:.1f}GB / {memory.total/1024/1024/1024:.1f}GB", 
                             color=mem_color, linewidth=2)
             self.ax_mem.fill_between(range(len(mem_data)), mem_data, alpha=0.3, color=mem_fill_color)
+            self.plot_anomalies(self.ax_mem, mem_data, list(self.anomalies.mem_flags), MEMORY_GROWTH)
+        
+        self.annotate_processes(self.ax_cpu, CPU_SHIFT)
+        self.annotate_processes(self.ax_mem, RSS_LEAK)
         
         self.ax_cpu.legend(loc='upper right', framealpha=0.8)
         self.ax_cpu.set_ylim(0, 100)
@@ -669,30 +682,43 @@ class ProcessMonitor:
         
         self.canvas.draw()
     
+    def plot_anomalies(self, ax, data, flags, label, marker='x'):
+        offset = len(data) - len(flags)
+        points = [i + offset for i, flagged in enumerate(flags) if flagged and i + offset >= 0]
+        if points:
+            ax.scatter(points, [data[i] for i in points], label=label, marker=marker, s=60,
+                       color=themes[self.current_theme]["warning"], zorder=3)
+    
+    def annotate_processes(self, ax, reason):
+        flagged = [proc for proc in self.existing_processes.values()
+                   if reason in proc.get('anomaly', ())]
+        if flagged:
+            lines = [f"⚠ {reason}"] + [f"{proc['name']} ({proc['pid']})" for proc in flagged[:3]]
+            if len(flagged) > 3:
+                lines.append(f"+{len(flagged) - 3} more")
+            ax.text(0.01, 0.97, "\n".join(lines), transform=ax.transAxes, va='top', fontsize=9,
+                    color=themes[self.current_theme]["warning"])
+    
     def update_dashboard(self):
         while True:
             try:
                 start_time = time.time()
                 processes = self.get_process_data()
+                cpu_overall, mem_percent = self.history.sample()
+                self.anomalies.update(processes, cpu_overall, mem_percent)
+                
                 self.root.after(0, self.update_tree, processes)
                 self.root.after(0, self.update_system_info)
-                
-                cpu_overall = psutil.cpu_percent()
-                cpu_per_core = psutil.cpu_percent(percpu=True)
-                self.cpu_history_overall.append(cpu_overall)
-                for i, cpu in enumerate(cpu_per_core):
-                    self.cpu_history_per_core[i].append(cpu)
-                
-                mem_percent = psutil.virtual_memory().percent
-                self.mem_history.append(mem_percent)
-                
                 self.root.after(0, self.update_graph)
                 self.existing_processes = processes
                 
                 update_time = datetime.now().strftime("%H:%M:%S")
-                self.root.after(0, self.status_var.set, 
-                              f"Last Updated: {update_time} | Processes: {len(processes)} | "
-                              f"CPU: {cpu_overall:.1f}% | Memory: {mem_percent:.1f}%")
+                status = (f"Last Updated: {update_time} | Processes: {len(processes)} | "
+                          f"CPU: {cpu_overall:.1f}% | Memory: {mem_percent:.1f}%")
+                anomalies = self.anomalies.summary()
+                if anomalies:
+                    status += f" | ⚠ {anomalies}"
+                self.root.after(0, self.status_var.set, status)
                 
                 elapsed = time.time() - start_time
                 sleep_time = max(0, self.refresh_var.get() - elapsed)
@@ -0,0 +1,313 @@
+import argparse
+import curses
+import locale
+import time
+from datetime import datetime
+from process_data import (
+    SystemHistory, ProcessCollector, passes_filters, sort_processes, usage_level, format_column,
+    COLUMNS, OPTIONAL_COLUMNS, COLUMN_GROUPS, HIGH_CPU_PERCENT, HIGH_MEMORY_MB, REFRESH_OPTIONS,
+    CPU_FILTER_OPTIONS, MEM_FILTER_OPTIONS, TYPE_FILTER_OPTIONS
+)
+from anomaly_detection import AnomalyMonitor
+
+# Curses frontend for hosts reached over SSH, where Tk isn't available.
+# Every cell written to the screen is cached, so a refresh only touches the
+# cells whose text or colour actually changed since the previous frame.
+
+SPARK_CHARS = " ▁▂▃▄▅▆▇█"
+HEADER_ROWS = 5
+
+# (title, width, right aligned); a width of None takes the remaining space
+TABLE_LAYOUT = [
+    ("PID", 7, True),
+    ("Name", None, False),
+    ("State", 10, False),
+    ("CPU %", 7, True),
+    ("Memory (MB)", 12, True)
+]
+OPTIONAL_LAYOUT = {col: (col, max(8, len(col)), True) for col in OPTIONAL_COLUMNS}
+
+# Command line names for the optional column groups, toggled with keys 1-4.
+# Keys stay fixed when a group isn't available on this platform.
+GROUP_NAMES = {"io": "Disk I/O", "ctx": "Context Switches", "threads": "Threads", "fds": "Open FDs"}
+GROUP_KEYS = {str(i): name for i, name in enumerate(GROUP_NAMES, start=1)
+              if GROUP_NAMES[name] in COLUMN_GROUPS}
+GROUP_NAMES = {name: group for name, group in GROUP_NAMES.items() if group in COLUMN_GROUPS}
+
+HELP_TEXT = ("q:quit  c:CPU≥  m:MB≥  t:type  x:clear  s:sort  r:reverse  +/-:refresh  "
+             + " ".join(f"{key}:{name}" for key, name in GROUP_KEYS.items())
+             + "  ↑↓/PgUp/PgDn:scroll")
+
+def sparkline(values, width):
+    data = list(values)[-width:]
+    levels = len(SPARK_CHARS) - 1
+    chars = [SPARK_CHARS[min(levels, max(0, round(v / 100 * levels)))] for v in data]
+    return "".join(chars).rjust(width)
+
+def cycle(options, current, step=1):
+    return options[(options.index(current) + step) % len(options)]
+
+class TerminalMonitor:
+    def __init__(self, stdscr, refresh=1.0, groups=()):
+        self.stdscr = stdscr
+        self.history = SystemHistory()
+        self.anomalies = AnomalyMonitor()
+        self.groups = set(groups)
+        self.collector = ProcessCollector(self.enabled_columns())
+        self.existing_processes = {}
+        self.rows = []
+        self.cells = {}
+        self.size = None
+        self.layout = []
+        self.scroll = 0
+        self.status = "Collecting..."
+
+        self.cpu_filter = "All"
+        self.mem_filter = "All"
+        self.user_filter = "All"
+        self.sort_col = "CPU %"
+        self.sort_reverse = True
+        self.refresh = refresh
+
+        self.setup_screen()
+
+    def setup_screen(self):
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.stdscr.keypad(True)
+
+        self.attrs = {name: 0 for name in ('low', 'medium', 'high', 'high_cpu',
+                                           'high_mem', 'system_process', 'anomaly',
+                                           'heading')}
+        self.attrs['heading'] = curses.A_REVERSE | curses.A_BOLD
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            pairs = [
+                ('low', curses.COLOR_GREEN),
+                ('medium', curses.COLOR_YELLOW),
+                ('high', curses.COLOR_RED),
+                ('high_cpu', curses.COLOR_RED),
+                ('high_mem', curses.COLOR_YELLOW),
+                ('system_process', curses.COLOR_CYAN),
+                ('anomaly', curses.COLOR_MAGENTA)
+            ]
+            for i, (name, color) in enumerate(pairs, start=1):
+                curses.init_pair(i, color, -1)
+                self.attrs[name] = curses.color_pair(i)
+            self.attrs['high_cpu'] |= curses.A_BOLD
+        self.attrs['anomaly'] |= curses.A_BOLD | curses.A_UNDERLINE
+
+    def enabled_columns(self):
+        return tuple(col for col in OPTIONAL_COLUMNS
+                     if any(col in COLUMN_GROUPS[group] for group in self.groups))
+
+    def toggle_group(self, group):
+        self.groups ^= {group}
+        self.collector.columns = self.enabled_columns()
+        if self.sort_col not in COLUMNS + self.collector.columns:
+            self.sort_col = "CPU %"
+        # Force a relayout on the next frame
+        self.size = None
+
+    def put(self, y, x, text, attr=0):
+        text = text[:max(0, self.size[1] - x)]
+        row = self.cells.setdefault(y, {})
+        if not text or row.get(x) == (text, attr):
+            return
+        try:
+            self.stdscr.addstr(y, x, text, attr)
+        except curses.error:
+            # Writing the bottom-right cell moves the cursor off screen
+            pass
+        row[x] = (text, attr)
+
+    def clear_line(self, y):
+        blank = " " * self.size[1]
+        if self.cells.get(y) == {0: (blank, 0)}:
+            return
+        try:
+            self.stdscr.addstr(y, 0, blank)
+        except curses.error:
+            pass
+        self.cells[y] = {0: (blank, 0)}
+
+    def check_resize(self):
+        size = self.stdscr.getmaxyx()
+        if size == self.size:
+            return
+        self.size = size
+        self.cells.clear()
+        self.stdscr.erase()
+
+        width = size[1]
+        table_layout = TABLE_LAYOUT + [OPTIONAL_LAYOUT[col] for col in self.collector.columns]
+        fixed = sum(w for _, w, _ in table_layout if w) + len(table_layout) - 1
+        self.layout = []
+        x = 0
+        for title, w, right in table_layout:
+            w = w or max(8, width - fixed)
+            self.layout.append((title, x, w, right))
+            x += w + 1
+
+    def sample(self):
+        processes = self.collector.collect()
+        cpu_overall, mem_percent = self.history.sample()
+        self.anomalies.update(processes, cpu_overall, mem_percent)
+        self.existing_processes = processes
+        self.update_rows()
+
+        update_time = datetime.now().strftime("%H:%M:%S")
+        self.status = (f"Last Updated: {update_time} | Processes: {len(processes)} | "
+                       f"CPU: {cpu_overall:.1f}% | Memory: {mem_percent:.1f}%")
+        anomalies = self.anomalies.summary()
+        if anomalies:
+            self.status += f" | ! {anomalies}"
+
+    def update_rows(self):
+        visible = [proc for proc in self.existing_processes.values()
+                   if passes_filters(proc, self.cpu_filter, self.mem_filter, self.user_filter)]
+        self.rows = sort_processes(visible, self.sort_col, self.sort_reverse)
+
+    def row_attr(self, proc):
+        if proc.get('anomaly'):
+            return self.attrs['anomaly']
+        if proc['cpu'] > HIGH_CPU_PERCENT:
+            return self.attrs['high_cpu']
+        if proc['memory'] > HIGH_MEMORY_MB:
+            return self.attrs['high_mem']
+        if proc['is_system']:
+            return self.attrs['system_process']
+        return 0
+
+    def draw_series(self, y, label, history, flags):
+        width = self.size[1]
+        data = list(history)
+        current = data[-1] if data else 0.0
+        flagged = bool(flags) and flags[-1]
+        text = f"{label} {current:5.1f}% {'!' if flagged else ' '} "
+        self.put(y, 0, text, self.attrs['anomaly'] if flagged else 0)
+        spark_width = max(0, width - len(text) - 1)
+        if spark_width:
+            attr = self.attrs['anomaly'] if flagged else self.attrs[usage_level(current)]
+            self.put(y, len(text), sparkline(data, spark_width), attr)
+
+    def draw(self):
+        self.check_resize()
+        height, width = self.size
+
+        title = f"PROCESS MONITOR  |  {self.status}"
+        self.put(0, 0, title.ljust(width - 1)[:width - 1], curses.A_BOLD)
+        self.draw_series(1, "CPU", self.history.cpu_overall, self.anomalies.cpu_flags)
+        self.draw_series(2, "MEM", self.history.memory, self.anomalies.mem_flags)
+
+        arrow = "↓" if self.sort_reverse else "↑"
+        controls = (f"CPU ≥ {self.cpu_filter}  MB ≥ {self.mem_filter}  Type: {self.user_filter}  |  "
+                    f"Sort: {self.sort_col} {arrow}  |  Refresh: {self.refresh:.1f}s")
+        self.put(3, 0, controls.ljust(width - 1)[:width - 1])
+
+        for title, x, w, right in self.layout:
+            if title == self.sort_col:
+                title = f"{title} {arrow}"
+            text = title.rjust(w) if right else title.ljust(w)
+            self.put(4, x, text[:w] + " ", self.attrs['heading'])
+
+        table_height = max(0, height - HEADER_ROWS - 1)
+        self.scroll = max(0, min(self.scroll, len(self.rows) - table_height))
+        for i in range(table_height):
+            y = HEADER_ROWS + i
+            idx = self.scroll + i
+            if idx >= len(self.rows):
+                self.clear_line(y)
+                continue
+            proc = self.rows[idx]
+            attr = self.row_attr(proc)
+            for col, x, w, right in self.layout:
+                text = format_column(proc, col)
+                text = text.rjust(w) if right else text.ljust(w)
+                self.put(y, x, text[:w], attr)
+
+        self.put(height - 1, 0, HELP_TEXT.ljust(width - 1)[:width - 1], curses.A_DIM)
+        self.stdscr.refresh()
+
+    def handle_key(self, key):
+        table_height = max(1, self.size[0] - HEADER_ROWS - 1)
+        if key in (ord('q'), 27):
+            return False
+        elif key == ord('c'):
+            self.cpu_filter = cycle(CPU_FILTER_OPTIONS, self.cpu_filter)
+        elif key == ord('m'):
+            self.mem_filter = cycle(MEM_FILTER_OPTIONS, self.mem_filter)
+        elif key == ord('t'):
+            self.user_filter = cycle(TYPE_FILTER_OPTIONS, self.user_filter)
+        elif key == ord('x'):
+            self.cpu_filter = self.mem_filter = self.user_filter = "All"
+        elif key == ord('s'):
+            self.sort_col = cycle(list(COLUMNS + self.collector.columns), self.sort_col)
+        elif key == ord('r'):
+            self.sort_reverse = not self.sort_reverse
+        elif key in (ord('+'), ord('=')):
+            self.refresh = REFRESH_OPTIONS[min(len(REFRESH_OPTIONS) - 1,
+                                               self.refresh_index() + 1)]
+        elif key == ord('-'):
+            self.refresh = REFRESH_OPTIONS[max(0, self.refresh_index() - 1)]
+        elif 0 <= key < 256 and chr(key) in GROUP_KEYS:
+            self.toggle_group(GROUP_NAMES[GROUP_KEYS[chr(key)]])
+        elif key == curses.KEY_DOWN:
+            self.scroll += 1
+        elif key == curses.KEY_UP:
+            self.scroll -= 1
+        elif key == curses.KEY_NPAGE:
+            self.scroll += table_height
+        elif key == curses.KEY_PPAGE:
+            self.scroll -= table_height
+        elif key == curses.KEY_HOME:
+            self.scroll = 0
+        elif key == curses.KEY_RESIZE:
+            self.size = None
+        self.scroll = max(0, self.scroll)
+        self.update_rows()
+        return True
+
+    def refresh_index(self):
+        if self.refresh in REFRESH_OPTIONS:
+            return REFRESH_OPTIONS.index(self.refresh)
+        return min(range(len(REFRESH_OPTIONS)),
+                   key=lambda i: abs(REFRESH_OPTIONS[i] - self.refresh))
+
+    def run(self):
+        next_sample = 0.0
+        while True:
+            now = time.monotonic()
+            if now >= next_sample:
+                try:
+                    self.sample()
+                except Exception as e:
+                    error_time = datetime.now().strftime("%H:%M:%S")
+                    self.status = f"Error at {error_time}: {str(e)} - Retrying..."
+                next_sample = now + self.refresh
+            self.draw()
+
+            wait = max(0.0, next_sample - time.monotonic())
+            self.stdscr.timeout(max(1, int(wait * 1000)))
+            key = self.stdscr.getch()
+            if key != -1 and not self.handle_key(key):
+                break
+
+def main():
+    parser = argparse.ArgumentParser(description="Terminal process monitor")
+    parser.add_argument("-i", "--interval", type=float, default=1.0,
+                        help="refresh interval in seconds (default: 1.0)")
+    parser.add_argument("-c", "--columns", nargs="*", default=[], choices=list(GROUP_NAMES),
+                        help="optional columns to show: per-process I/O rates, context "
+                             "switch rates, thread count, open FD count")
+    args = parser.parse_args()
+    groups = [GROUP_NAMES[name] for name in args.columns]
+
+    locale.setlocale(locale.LC_ALL, "")
+    curses.wrapper(lambda stdscr: TerminalMonitor(stdscr, refresh=args.interval, groups=groups).run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from anomaly_detection import AnomalyMonitor, SeriesDetector, PROCESS_SURGE
+from process_data import REFRESH_OPTIONS
+
+KEYS = np.zeros(1, dtype=np.int64)
+CREATE_TIMES = np.zeros(1)
+
+def feed(detector, series, interval):
+    shifted, grown = [], []
+    for i, value in enumerate(series):
+        s, g = detector.update(KEYS, CREATE_TIMES, [value], i * interval)
+        shifted.append(bool(s[0]))
+        grown.append(bool(g[0]))
+    return np.array(shifted), np.array(grown)
+
+def timeline(interval, seconds):
+    return np.arange(int(seconds / interval)) * interval
+
+def rss_detector():
+    return SeriesDetector(detect_shift=False, min_growth=20.0)
+
+@pytest.mark.parametrize("interval", REFRESH_OPTIONS)
+@pytest.mark.parametrize("step", [30, 300, 10000])
+def test_single_step_is_not_a_leak(interval, step):
+    t = timeline(interval, 1200)
+    _, grown = feed(rss_detector(), np.where(t < 300, 100.0, 100.0 + step), interval)
+    assert not grown.any()
+
+@pytest.mark.parametrize("interval", REFRESH_OPTIONS)
+def test_steady_leak_is_flagged(interval):
+    rng = np.random.default_rng(0)
+    t = timeline(interval, 1800)
+    _, grown = feed(rss_detector(), 100 + 0.1 * t + rng.normal(0, 2, len(t)), interval)
+    assert grown.any()
+    assert t[grown.argmax()] >= 120
+    assert grown[t >= 900].all()
+
+@pytest.mark.parametrize("interval", REFRESH_OPTIONS)
+def test_leak_clears_once_flat(interval):
+    t = timeline(interval, 1500)
+    _, grown = feed(rss_detector(), np.minimum(100 + 0.5 * t, 400), interval)
+    assert grown[(t > 300) & (t < 600)].any()
+    assert not grown[t >= 600 + 240].any()
+
+@pytest.mark.parametrize("interval", REFRESH_OPTIONS)
+def test_stationary_noise_is_quiet(interval):
+    rng = np.random.default_rng(1)
+    t = timeline(interval, 1800)
+    _, grown = feed(rss_detector(), 100 + rng.normal(0, 2, len(t)), interval)
+    shifted, _ = feed(SeriesDetector(floor=15.0), 20 + rng.normal(0, 3, len(t)), interval)
+    assert not grown.any()
+    assert not shifted.any()
+
+@pytest.mark.parametrize("interval", REFRESH_OPTIONS)
+def test_recurring_peaks_are_learned(interval):
+    rng = np.random.default_rng(2)
+    samples = np.arange(60 * 40)
+    peaks = np.where((samples % 60 >= 30) & (samples % 60 < 35), 90.0, 5.0)
+    shifted, _ = feed(SeriesDetector(floor=15.0), peaks + rng.uniform(0, 2, len(samples)), interval)
+    assert not shifted[samples >= 60 * 2].any()
+
+@pytest.mark.parametrize("interval", REFRESH_OPTIONS)
+def test_regime_change_is_flagged(interval):
+    rng = np.random.default_rng(3)
+    t = timeline(interval, 1200)
+    series = np.where(t < 600, 5.0, 65.0) + rng.uniform(0, 5, len(t))
+    shifted, _ = feed(SeriesDetector(floor=15.0), series, interval)
+    assert not shifted[t < 600].any()
+    assert shifted[(t >= 600) & (t < 630)].any()
+
+def test_process_surge_is_its_own_series():
+    monitor = AnomalyMonitor()
+    for i in range(60):
+        count = 50 if i < 50 else 200
+        processes = {pid: {'pid': pid, 'cpu': 1.0, 'memory': 10.0, 'create_timestamp': 1.0}
+                     for pid in range(count)}
+        monitor.update(processes, 20.0, 40.0, timestamp=i * 2.0)
+    assert PROCESS_SURGE in monitor.system_flags
+    assert monitor.surge_flags[-1]
+    assert not any(monitor.cpu_flags)